@@ -6,166 +6,280 @@
 import streamlit as st
 import geopandas as gpd
 import folium
-from streamlit_folium import st_folium
+from streamlit_folium import folium_static
 import os
 import numpy as np
 import pandas as pd
 import altair as alt
-from shapely.geometry import box, shape, Point, MultiLineString
-import branca.colormap as cm
+import shapely
+import pyproj
+import pyarrow as pa
+from pyarrow import csv as pacsv
+from shapely.geometry import shape, Point, MultiLineString
 import json
 import base64
-import math
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, Tuple
 
 # --- Global Configuration & Paths ---
 CURRENT_MONTH_YEAR = "July 2025"
 DATA_DIR = "data"
 
+# Source files whose modification times key the on-disk metrics cache.
+SOURCE_DATA_FILES = [
+    "bbmp-wards.geojson",
+    "bangalore_swd_primary.geojson",
+    "bbmp_floodprone_locations.geojson",
+    "flooding_vulnerable_locations.geojson",
+    "bbmp_lowlying_areas.geojson",
+]
+
 # ==============================================================================
 # HELPER FUNCTIONS - DATA PROCESSING AND METRICS
 # ==============================================================================
 
-@st.cache_data(ttl=3600)  # Cache data for 1 hour to optimize performance
-def load_geospatial_data() -> Tuple[gpd.GeoDataFrame, gpd.GeoDataFrame, gpd.GeoDataFrame]:
-    """Loads all core geospatial data files."""
+def _read_geofile(filename: str) -> gpd.GeoDataFrame:
+    """Reads a GeoJSON source file through a GeoParquet sidecar cache.
+
+    The first read parses the GeoJSON text and writes a .parquet sidecar;
+    subsequent cold starts decode the Arrow/WKB sidecar instead, which is far
+    faster than text parsing. Sidecars older than their source are rewritten.
+    """
+    source_path = os.path.join(DATA_DIR, filename)
+    cache_path = os.path.join(DATA_DIR, "_cache_" + filename.replace(".geojson", ".parquet"))
+    if os.path.exists(cache_path) and os.stat(cache_path).st_mtime >= os.stat(source_path).st_mtime:
+        try:
+            return gpd.read_parquet(cache_path)
+        except Exception:
+            pass  # unreadable sidecar; fall back to the GeoJSON source
+    gdf = gpd.read_file(source_path)
+    try:
+        gdf.to_parquet(cache_path)
+    except Exception:
+        pass  # the sidecar is a best-effort optimization
+    return gdf
+
+
+@st.cache_resource(ttl=3600)  # one shared copy per process; frames are read-only downstream
+def load_geospatial_data() -> Tuple[gpd.GeoDataFrame, gpd.GeoDataFrame, gpd.GeoDataFrame, gpd.GeoDataFrame, gpd.GeoDataFrame, np.ndarray]:
+    """Loads all core geospatial data files.
+
+    Reprojects each layer to the metric CRS (EPSG:32643) exactly once here,
+    so downstream metric functions can reuse the projected copies instead of
+    re-running the coordinate transforms. Held as a cache_resource rather
+    than cache_data: the frames are never mutated after loading, so handing
+    out the same objects skips the per-rerun unpickling copy and keeps each
+    frame's lazily built spatial index alive across reruns.
+    """
     try:
         # BBMP Wards (Polygons)
-        wards_path = os.path.join(DATA_DIR, "bbmp-wards.geojson")
-        wards_gdf = gpd.read_file(wards_path)
+        wards_gdf = _read_geofile("bbmp-wards.geojson")
         if wards_gdf.crs is None or wards_gdf.crs.is_projected:
             wards_gdf = wards_gdf.to_crs("EPSG:4326")
-        
-        # Calculate ward area in square kilometers
-        wards_gdf_proj_area = wards_gdf.to_crs(epsg=32643)
-        wards_gdf['area_sqkm'] = wards_gdf_proj_area.geometry.area / 10**6
+
+        # Calculate ward area in square kilometers (shapely 2 ufunc over the
+        # whole geometry array, avoiding per-geometry dispatch)
+        wards_proj_gdf = wards_gdf.to_crs(epsg=32643)
+        wards_gdf['area_sqkm'] = shapely.area(wards_proj_gdf.geometry.values) / 1e6
 
         # Primary Drains Data
-        drains_path = os.path.join(DATA_DIR, "bangalore_swd_primary.geojson")
-        primary_drains_gdf = gpd.read_file(drains_path)
+        primary_drains_gdf = _read_geofile("bangalore_swd_primary.geojson")
         if primary_drains_gdf.crs is None or primary_drains_gdf.crs.is_projected:
             primary_drains_gdf = primary_drains_gdf.to_crs("EPSG:4326")
-        
+
         # Calculate drain lengths in km
         primary_drains_gdf_proj = primary_drains_gdf.to_crs(epsg=32643)
-        primary_drains_gdf['length_km'] = primary_drains_gdf_proj.geometry.length / 1000
+        primary_drains_gdf['length_km'] = shapely.length(primary_drains_gdf_proj.geometry.values) / 1e3
 
         # All Flood Incident Points
-        floodprone_path = os.path.join(DATA_DIR, "bbmp_floodprone_locations.geojson")
-        vulnerable_path = os.path.join(DATA_DIR, "flooding_vulnerable_locations.geojson")
-        lowlying_path = os.path.join(DATA_DIR, "bbmp_lowlying_areas.geojson")
+        floodprone_gdf = _read_geofile("bbmp_floodprone_locations.geojson")
+        vulnerable_gdf = _read_geofile("flooding_vulnerable_locations.geojson")
+        lowlying_gdf = _read_geofile("bbmp_lowlying_areas.geojson")
+
+        # Reassign by index — rebinding the loop variable would silently
+        # discard the reprojected result. Layers already in EPSG:4326 are
+        # left untouched, skipping needless PROJ work.
+        point_layers = [floodprone_gdf, vulnerable_gdf, lowlying_gdf]
+        for i, gdf in enumerate(point_layers):
+            if gdf.crs is None or gdf.crs.is_projected:
+                point_layers[i] = gdf.to_crs("EPSG:4326")
 
-        floodprone_gdf = gpd.read_file(floodprone_path)
-        vulnerable_gdf = gpd.read_file(vulnerable_path)
-        lowlying_gdf = gpd.read_file(lowlying_path)
+        # Keep only the columns downstream code reads (marker tooltips and
+        # the per-ward breakdown); the rest of each source schema would just
+        # inflate the concat, the joins, and every cached copy.
+        point_columns = ['geometry', 'Name', 'LocationName', 'WARD_NAME', 'WARDNO']
+        point_layers = [
+            gdf[[c for c in point_columns if c in gdf.columns]] for gdf in point_layers
+        ]
 
-        for gdf in [floodprone_gdf, vulnerable_gdf, lowlying_gdf]:
-            if gdf.crs is None or gdf.crs.is_projected:
-                gdf = gdf.to_crs("EPSG:4326")
+        all_flood_points_gdf = pd.concat(point_layers, ignore_index=True)
+
+        # Ward names repeat heavily across incidents; a categorical dtype
+        # stores each label once and makes groupbys/counts dictionary-coded.
+        if 'WARD_NAME' in all_flood_points_gdf.columns:
+            all_flood_points_gdf['WARD_NAME'] = all_flood_points_gdf['WARD_NAME'].astype('category')
+
+        points_proj_gdf = all_flood_points_gdf.to_crs(epsg=32643)
+
+        # Flat (lon, lat) coordinate array for consumers that only need raw
+        # positions (heatmaps, binning) — avoids touching shapely objects later.
+        all_flood_points_xy = shapely.get_coordinates(all_flood_points_gdf.geometry.values)
+
+        # Touch the spatial indexes so the STRtrees are built once here, not
+        # lazily inside the first interactive query.
+        _ = wards_gdf.sindex
+        _ = wards_proj_gdf.sindex
+        _ = points_proj_gdf.sindex
+        _ = all_flood_points_gdf.sindex
+
+        return wards_gdf, primary_drains_gdf, all_flood_points_gdf, wards_proj_gdf, points_proj_gdf, all_flood_points_xy
 
-        all_flood_points_gdf = pd.concat([
-            floodprone_gdf,
-            vulnerable_gdf,
-            lowlying_gdf
-        ], ignore_index=True)
-        
-        return wards_gdf, primary_drains_gdf, all_flood_points_gdf
-    
     except Exception as e:
         st.error(f"Error loading geospatial data: {e}")
         st.stop()
 
 
-@st.cache_data(ttl=3600)
+MONTHS_ORDER = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun',
+                'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+
+# The CSV header spells three months out longer than the chart labels.
+CSV_MONTH_COLUMNS = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'June',
+                     'July', 'Aug', 'Sept', 'Oct', 'Nov', 'Dec']
+
+
+@st.cache_data(ttl=3600, persist="disk")
 def load_tabular_data() -> pd.DataFrame:
-    """Loads and preprocesses rainfall data."""
+    """Loads and preprocesses rainfall data. Persisted to disk so a process
+    restart within the TTL skips the parse entirely."""
     try:
         rainfall_csv_path = os.path.join(DATA_DIR, "bangalore-rainfall-data-1900-2024-sept.csv")
-        rainfall_df = pd.read_csv(rainfall_csv_path)
+        # Same sidecar scheme as _read_geofile: the fully processed frame is
+        # written to Parquet once, and later cold starts decode that
+        # (columnar, dtypes preserved — the ENSO categoricals round-trip)
+        # instead of re-parsing and re-deriving from the CSV.
+        cache_path = os.path.join(DATA_DIR, "_cache_rainfall.parquet")
+        if os.path.exists(cache_path) and os.stat(cache_path).st_mtime >= os.stat(rainfall_csv_path).st_mtime:
+            try:
+                return pd.read_parquet(cache_path)
+            except Exception:
+                pass  # unreadable sidecar; fall back to the CSV source
+        # Arrow's multi-threaded C++ parser with a declared schema skips
+        # pandas type inference. Year stays a string in the schema (the CSV
+        # has trailing non-numeric summary rows, "LPA (1991-2020)" etc.) and
+        # is coerced after the read.
+        table = pacsv.read_csv(
+            rainfall_csv_path,
+            convert_options=pacsv.ConvertOptions(
+                include_columns=['Year'] + CSV_MONTH_COLUMNS + ['Total', 'El NiNo (Y/N)', 'La Nina (Y/N)'],
+                column_types=dict(
+                    {'Year': pa.string(), 'Total': pa.float32(),
+                     'El NiNo (Y/N)': pa.string(), 'La Nina (Y/N)': pa.string()},
+                    **{month: pa.float32() for month in CSV_MONTH_COLUMNS},
+                ),
+            ),
+        )
+        rainfall_df = table.to_pandas()
+        rainfall_df.rename(columns=dict(zip(CSV_MONTH_COLUMNS, MONTHS_ORDER)), inplace=True)
         rainfall_df['Year'] = pd.to_numeric(rainfall_df['Year'], errors='coerce').fillna(0).astype(int)
         rainfall_df.dropna(subset=['Total'], inplace=True)
+        # Y/N flags collapse to two categories; comparisons against the
+        # categorical run on codes rather than Python-level string equality.
+        rainfall_df['El NiNo (Y/N)'] = rainfall_df['El NiNo (Y/N)'].astype('category')
+        rainfall_df['La Nina (Y/N)'] = rainfall_df['La Nina (Y/N)'].astype('category')
         
         avg_annual_rainfall = rainfall_df['Total'].mean()
         rainfall_df['deviation_from_mean'] = rainfall_df['Total'] - avg_annual_rainfall
-        
+
+        try:
+            rainfall_df.to_parquet(cache_path)
+        except Exception:
+            pass  # the sidecar is a best-effort optimization
+
         return rainfall_df
         
     except Exception as e:
         st.error(f"Error loading rainfall data: {e}")
         st.stop()
 
+
 @st.cache_data(ttl=3600)
-def calculate_flood_incident_metrics(_wards_gdf, _all_flood_points_gdf) -> gpd.GeoDataFrame:
+def compute_rainfall_derivatives(rainfall_df) -> Tuple[pd.DataFrame, str, str]:
+    """Derives the monthly-average frame and ENSO year display strings from
+    the rainfall table, cached so reruns reuse them instead of recomputing."""
+    # One pass over the 124x12 float32 month matrix gives the 12 values
+    # directly; no need to melt to long form and group back down. nanmean
+    # matches the pandas skipna behavior (2024 is a partial year).
+    month_matrix = rainfall_df[MONTHS_ORDER].to_numpy(dtype=np.float32)
+    average_monthly = np.nanmean(month_matrix, axis=0)
+    average_monthly_df = pd.DataFrame({'Month': MONTHS_ORDER, 'Rainfall': average_monthly})
+    el_nino_str = ", ".join(rainfall_df.loc[rainfall_df['El NiNo (Y/N)'] == 'Y', 'Year'].astype(str))
+    la_nina_str = ", ".join(rainfall_df.loc[rainfall_df['La Nina (Y/N)'] == 'Y', 'Year'].astype(str))
+    return average_monthly_df, el_nino_str, la_nina_str
+
+
+def calculate_flood_incident_metrics(wards_gdf, all_flood_points_gdf, wards_proj_gdf, points_proj_gdf) -> gpd.GeoDataFrame:
     """
-    Calculates direct and proximity-based flood incident counts.
-    
+    Calculates direct and proximity-based flood incident counts in place.
+
     Args:
-        _wards_gdf (gpd.GeoDataFrame): GeoDataFrame of BBMP wards.
-        _all_flood_points_gdf (gpd.GeoDataFrame): GeoDataFrame of all flood incidents.
-    
+        wards_gdf (gpd.GeoDataFrame): GeoDataFrame of BBMP wards.
+        all_flood_points_gdf (gpd.GeoDataFrame): GeoDataFrame of all flood incidents.
+        wards_proj_gdf (gpd.GeoDataFrame): Wards pre-projected to EPSG:32643.
+        points_proj_gdf (gpd.GeoDataFrame): Flood incidents pre-projected to EPSG:32643.
+
     Returns:
         gpd.GeoDataFrame: Wards GeoDataFrame with new incident metrics.
     """
-    wards_gdf = _wards_gdf.copy()
-    all_flood_points_gdf = _all_flood_points_gdf.copy()
-
-    # Calculate direct incident count (points within ward)
-    wards_with_points = gpd.sjoin(all_flood_points_gdf, wards_gdf, how="inner", predicate="within")
-    incident_counts = wards_with_points.groupby('index_right').size().rename("incident_count")
-    wards_gdf = wards_gdf.merge(incident_counts, left_index=True, right_index=True, how="left")
-    wards_gdf['incident_count'] = wards_gdf['incident_count'].fillna(0).astype(int)
-
-    # Calculate proximity incident count (points within a 500m buffer)
-    wards_gdf_proj_buffer = wards_gdf.to_crs(epsg=32643) 
-    buffered_wards_gdf_proj = wards_gdf_proj_buffer.copy()
-    buffered_wards_gdf_proj['geometry'] = buffered_wards_gdf_proj.geometry.buffer(500)
-
-    points_proj = all_flood_points_gdf.to_crs(epsg=32643)
-    wards_with_buffered_points = gpd.sjoin(points_proj, buffered_wards_gdf_proj, how="inner", predicate="within")
-    buffered_incident_counts = wards_with_buffered_points.groupby('index_right').size().rename("buffered_incident_count")
-
-    wards_gdf = wards_gdf.merge(buffered_incident_counts, left_index=True, right_index=True, how="left")
-    wards_gdf['buffered_incident_count'] = wards_gdf['buffered_incident_count'].fillna(0).astype(int)
-    
-    # Incident Density
-    wards_gdf['incident_density_sqkm'] = wards_gdf.apply(
-        lambda row: (row['incident_count'] / row['area_sqkm']) if row['area_sqkm'] > 0 else 0, axis=1
+    # Calculate direct incident count (points within ward). Querying the
+    # spatial index in bulk returns (point, ward) index pairs straight from
+    # GEOS, and bincount turns them into positionally-aligned counts without
+    # the sjoin's intermediate DataFrames.
+    _, ward_idx = wards_gdf.sindex.query(all_flood_points_gdf.geometry.values, predicate="within")
+    wards_gdf['incident_count'] = np.bincount(ward_idx, minlength=len(wards_gdf)).astype(int)
+
+    # Calculate proximity incident count (points within 500m of the ward).
+    # The dwithin predicate answers the distance query straight from the
+    # spatial index, and unlike a nearest-join it credits a point to every
+    # ward within range, matching the original buffered semantics.
+    _, near_ward_idx = wards_proj_gdf.sindex.query(
+        points_proj_gdf.geometry.values, predicate="dwithin", distance=500
     )
-    wards_gdf['incident_density_sqkm'] = wards_gdf['incident_density_sqkm'].replace([np.inf, -np.inf], 0).fillna(0)
+    wards_gdf['buffered_incident_count'] = np.bincount(
+        near_ward_idx, minlength=len(wards_gdf)
+    ).astype(int)
+    
+    # Incident Density (vectorized; np.where guards against zero-area wards)
+    area = wards_gdf['area_sqkm'].to_numpy()
+    counts = wards_gdf['incident_count'].to_numpy()
+    wards_gdf['incident_density_sqkm'] = np.where(area > 0, counts / np.where(area > 0, area, 1), 0.0)
     
     return wards_gdf
 
 
-@st.cache_data(ttl=3600)
-def calculate_drainage_metrics(_wards_gdf, _primary_drains_gdf) -> gpd.GeoDataFrame:
+def calculate_drainage_metrics(wards_gdf, primary_drains_gdf) -> gpd.GeoDataFrame:
     """
-    Calculates drainage-related metrics for each ward.
-    
+    Calculates drainage-related metrics for each ward in place.
+
     Args:
-        _wards_gdf (gpd.GeoDataFrame): GeoDataFrame of BBMP wards.
-        _primary_drains_gdf (gpd.GeoDataFrame): GeoDataFrame of primary drains.
-    
+        wards_gdf (gpd.GeoDataFrame): GeoDataFrame of BBMP wards.
+        primary_drains_gdf (gpd.GeoDataFrame): GeoDataFrame of primary drains.
+
     Returns:
         gpd.GeoDataFrame: Wards GeoDataFrame with new drainage metrics.
     """
-    wards_gdf = _wards_gdf.copy()
-    primary_drains_gdf = _primary_drains_gdf.copy()
-    
-    # Spatial join drains to wards
-    wards_with_drains = gpd.sjoin(primary_drains_gdf, wards_gdf, how="inner", predicate="intersects")
-    
-    # Group by ward and sum drain lengths within each ward
-    drain_lengths_per_ward = wards_with_drains.groupby('index_right')['length_km'].sum().rename("drain_length_km")
-    
-    # Merge back to wards_gdf
-    wards_gdf = wards_gdf.merge(drain_lengths_per_ward, left_index=True, right_index=True, how="left")
-    wards_gdf['drain_length_km'] = wards_gdf['drain_length_km'].fillna(0)
-
-    # Calculate Drainage Density
-    wards_gdf['drainage_density_km_sqkm'] = wards_gdf.apply(
-        lambda row: (row['drain_length_km'] / row['area_sqkm']) if row['area_sqkm'] > 0 else 0, axis=1
+    # Query the wards' cached spatial index with the drain geometries; the
+    # weighted bincount sums drain lengths per ward in a single C pass and is
+    # already positionally aligned, so no groupby/merge is needed.
+    drain_idx, ward_idx = wards_gdf.sindex.query(primary_drains_gdf.geometry.values, predicate="intersects")
+    wards_gdf['drain_length_km'] = np.bincount(
+        ward_idx, weights=primary_drains_gdf['length_km'].to_numpy()[drain_idx], minlength=len(wards_gdf)
     )
-    wards_gdf['drainage_density_km_sqkm'] = wards_gdf['drainage_density_km_sqkm'].replace([np.inf, -np.inf], 0).fillna(0)
+
+    # Calculate Drainage Density (vectorized; np.where guards against zero-area wards)
+    area = wards_gdf['area_sqkm'].to_numpy()
+    drain_lengths = wards_gdf['drain_length_km'].to_numpy()
+    wards_gdf['drainage_density_km_sqkm'] = np.where(area > 0, drain_lengths / np.where(area > 0, area, 1), 0.0)
     
     # Calculate an inverse drainage risk factor: lower density = higher risk
     max_drainage_density = wards_gdf['drainage_density_km_sqkm'].max()
@@ -176,88 +290,358 @@ def calculate_drainage_metrics(_wards_gdf, _primary_drains_gdf) -> gpd.GeoDataFr
     
     return wards_gdf
 
-@st.cache_data(ttl=3600)
-def calculate_composite_resilience_index(_wards_gdf, _rainfall_df) -> gpd.GeoDataFrame:
+def calculate_composite_resilience_index(wards_gdf, rainfall_df) -> gpd.GeoDataFrame:
     """
-    Calculates a comprehensive, multi-factor resilience index for each ward.
-    
+    Calculates a comprehensive, multi-factor resilience index for each ward in place.
+
     Args:
-        _wards_gdf (gpd.GeoDataFrame): GeoDataFrame of BBMP wards with incident/drainage metrics.
-        _rainfall_df (pd.DataFrame): DataFrame of historical rainfall data.
-        
+        wards_gdf (gpd.GeoDataFrame): GeoDataFrame of BBMP wards with incident/drainage metrics.
+        rainfall_df (pd.DataFrame): DataFrame of historical rainfall data.
+
     Returns:
         gpd.GeoDataFrame: Wards GeoDataFrame with the new resilience index and risk levels.
     """
-    wards_gdf = _wards_gdf.copy()
-    
     # Define weighting for the composite score (these are heuristic values for demonstration)
     WEIGHT_INCIDENT_DENSITY = 0.4
     WEIGHT_PROXIMITY_INCIDENTS = 0.2
     WEIGHT_DRAINAGE_EFFICIENCY = 0.4 # Inverse, so less drain is higher risk
-    
+
+    def _normalize(arr: np.ndarray) -> np.ndarray:
+        """Scales an array to 0-1; the epsilon guard makes all-zero inputs a no-op."""
+        return arr / max(arr.max(), 1e-12)
+
     # Normalize metrics to a 0-1 scale to allow for fair weighting
     # Incident Density
-    max_incident_density = wards_gdf['incident_density_sqkm'].max()
-    if max_incident_density > 0:
-        wards_gdf['normalized_incident_density'] = wards_gdf['incident_density_sqkm'] / max_incident_density
-    else:
-        wards_gdf['normalized_incident_density'] = 0
-        
+    normalized_incident_density = _normalize(wards_gdf['incident_density_sqkm'].to_numpy())
+    wards_gdf['normalized_incident_density'] = normalized_incident_density
+
     # Proximity Incidents (log transform to prevent a few outliers from dominating)
-    wards_gdf['log_buffered_incidents'] = wards_gdf['buffered_incident_count'].apply(lambda x: math.log1p(x))
-    max_log_buffered_incidents = wards_gdf['log_buffered_incidents'].max()
-    if max_log_buffered_incidents > 0:
-        wards_gdf['normalized_proximity'] = wards_gdf['log_buffered_incidents'] / max_log_buffered_incidents
-    else:
-        wards_gdf['normalized_proximity'] = 0
+    log_buffered_incidents = np.log1p(wards_gdf['buffered_incident_count'].to_numpy())
+    wards_gdf['log_buffered_incidents'] = log_buffered_incidents
+    normalized_proximity = _normalize(log_buffered_incidents)
+    wards_gdf['normalized_proximity'] = normalized_proximity
 
     # Drainage Efficiency (inverse relationship, already calculated as `drainage_risk_factor`)
-    wards_gdf['normalized_drainage_risk'] = wards_gdf['drainage_risk_factor']
-    
-    # Calculate the Composite Resilience Index
-    wards_gdf['Composite_Resilience_Index'] = (
-        (wards_gdf['normalized_incident_density'] * WEIGHT_INCIDENT_DENSITY) +
-        (wards_gdf['normalized_proximity'] * WEIGHT_PROXIMITY_INCIDENTS) +
-        (wards_gdf['normalized_drainage_risk'] * WEIGHT_DRAINAGE_EFFICIENCY)
+    normalized_drainage_risk = wards_gdf['drainage_risk_factor'].to_numpy()
+    wards_gdf['normalized_drainage_risk'] = normalized_drainage_risk
+
+    # Calculate the Composite Resilience Index: one weighted dot product over
+    # the stacked factors, then rescale to 0-100 for easier interpretation.
+    weights = np.array([WEIGHT_INCIDENT_DENSITY, WEIGHT_PROXIMITY_INCIDENTS, WEIGHT_DRAINAGE_EFFICIENCY])
+    composite_index = weights @ np.stack([normalized_incident_density, normalized_proximity, normalized_drainage_risk])
+    wards_gdf['Composite_Resilience_Index'] = _normalize(composite_index) * 100
+        
+    # Assign Risk Level based on the new index: a searchsorted bin lookup
+    # indexes straight into the label array, with no Categorical built on
+    # the way (bin edges are inclusive on the left, matching [10, 35) etc.)
+    resilience_edges = np.array([10, 35, 60, 85])
+    resilience_labels = np.array(["High Resilience", "Low Vulnerability", "Moderate Vulnerability",
+                                  "High Vulnerability", "Extreme Vulnerability"])
+    wards_gdf['resilience_level'] = resilience_labels[
+        np.searchsorted(resilience_edges, wards_gdf['Composite_Resilience_Index'].to_numpy(), side='right')
+    ]
+
+    return wards_gdf
+
+
+def _source_data_version() -> str:
+    """Returns a short hash of the source files' modification times."""
+    stamp = "|".join(
+        str(os.stat(os.path.join(DATA_DIR, name)).st_mtime)
+        for name in SOURCE_DATA_FILES
+        if os.path.exists(os.path.join(DATA_DIR, name))
     )
+    return hashlib.md5(stamp.encode()).hexdigest()[:12]
 
-    # Normalize the final index to a scale of 0-100 for easier interpretation
-    max_index = wards_gdf['Composite_Resilience_Index'].max()
-    if max_index > 0:
-        wards_gdf['Composite_Resilience_Index'] = (wards_gdf['Composite_Resilience_Index'] / max_index) * 100
-    else:
-        wards_gdf['Composite_Resilience_Index'] = 0
-        
-    # Assign Risk Level based on the new index
-    def assign_resilience_level(score):
-        if score >= 85: return "Extreme Vulnerability"
-        elif score >= 60: return "High Vulnerability"
-        elif score >= 35: return "Moderate Vulnerability"
-        elif score >= 10: return "Low Vulnerability"
-        else: return "High Resilience"
-
-    wards_gdf['resilience_level'] = wards_gdf['Composite_Resilience_Index'].apply(assign_resilience_level)
-    
+
+@st.cache_data(ttl=3600)
+def compute_or_load_ward_metrics(_wards_gdf, _primary_drains_gdf, _all_flood_points_gdf,
+                                 _wards_proj_gdf, _points_proj_gdf, _rainfall_df) -> gpd.GeoDataFrame:
+    """
+    Runs the full metrics pipeline, persisting the result to a GeoParquet
+    cache keyed by the source files' modification times. Warm starts skip
+    all spatial joins, buffers, and reprojections with a single columnar read.
+
+    This is the only cached stage: the calculate_* helpers mutate a single
+    working copy in place, so the pipeline takes one GeoDataFrame copy and
+    one cache serialization instead of one per stage.
+    """
+    cache_path = os.path.join(DATA_DIR, f"_cache_bbmp_wards_{_source_data_version()}.parquet")
+    if os.path.exists(cache_path):
+        try:
+            cached = gpd.read_parquet(cache_path)
+            # Recompute if the cache predates newer pipeline columns.
+            if 'centroid_lat' in cached.columns:
+                return cached
+        except Exception:
+            pass  # fall through and recompute if the cache file is unreadable
+
+    wards_gdf = _wards_gdf.copy()
+    wards_gdf = calculate_flood_incident_metrics(wards_gdf, _all_flood_points_gdf, _wards_proj_gdf, _points_proj_gdf)
+    wards_gdf = calculate_drainage_metrics(wards_gdf, _primary_drains_gdf)
+    wards_gdf = calculate_composite_resilience_index(wards_gdf, _rainfall_df)
+
+    # Centroids computed once here, on the projected CRS (centroids of
+    # geographic coordinates are mathematically off and warn), then carried
+    # as plain lat/lon columns so map centering never touches Shapely again.
+    centroids = _wards_proj_gdf.geometry.centroid.to_crs("EPSG:4326")
+    wards_gdf['centroid_lat'] = centroids.y.values
+    wards_gdf['centroid_lon'] = centroids.x.values
+
+    # Downcast metric columns: everything downstream is visualization and
+    # classification, where 32-bit precision is ample. Narrower columns halve
+    # the Streamlit cache pickles, the Parquet cache, and the map payload.
+    float_cols = ['area_sqkm', 'incident_density_sqkm', 'drain_length_km',
+                  'drainage_density_km_sqkm', 'drainage_risk_factor',
+                  'log_buffered_incidents', 'normalized_incident_density',
+                  'normalized_proximity', 'normalized_drainage_risk',
+                  'Composite_Resilience_Index']
+    wards_gdf[float_cols] = wards_gdf[float_cols].astype('float32')
+    count_cols = ['incident_count', 'buffered_incident_count']
+    wards_gdf[count_cols] = wards_gdf[count_cols].astype('int32')
+
+    try:
+        wards_gdf.to_parquet(cache_path)
+    except Exception:
+        pass  # the cache is a best-effort optimization; never fail startup for it
     return wards_gdf
 
+@st.cache_data(ttl=3600)
+def _ward_names(_wards_gdf) -> list:
+    """Returns the sorted, de-duplicated ward names for the selector once
+    per session instead of rebuilding the list on every rerun."""
+    return sorted(_wards_gdf['KGISWardName'].dropna().unique().tolist())
+
+
+@st.cache_data(ttl=3600)
+def incident_counts_by_ward(_all_flood_points_gdf, version_key: str) -> pd.DataFrame:
+    """Counts incidents per ward once per data version for the breakdown
+    chart, instead of re-running value_counts on every rerun."""
+    counts = _all_flood_points_gdf['WARD_NAME'].value_counts()
+    counts = counts[counts > 0].reset_index()
+    counts.columns = ['Ward', 'Count']
+    counts['Ward'] = counts['Ward'].astype(str)
+    return counts
+
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def build_ward_grid(ward_name: str, grid_size_meters: int, version_key: str,
+                    _wards_gdf, _all_flood_points_gdf) -> gpd.GeoDataFrame:
+    """Builds the hotspot grid for one ward with per-cell incident counts.
+
+    Cached on (ward name, grid size, data version), so reruns triggered by
+    unrelated widget interactions reuse the finished grid instead of
+    regenerating, reprojecting, and re-joining it.
+    """
+    # Positional access on the GeometryArray hands back the Shapely geometry
+    # directly, skipping pandas' one-row Series construction; the frame is
+    # indexed by ward name so locating the row is a hash probe.
+    ward_geom = _wards_gdf.geometry.values[_wards_gdf.index.get_loc(ward_name)]
+    clicked_gdf = gpd.GeoDataFrame([1], geometry=[ward_geom], crs="EPSG:4326")
+    clicked_gdf_proj = clicked_gdf.to_crs("EPSG:32643")
+
+    minx, miny, maxx, maxy = clicked_gdf_proj.total_bounds
+    x_coords = np.arange(minx, maxx + grid_size_meters, grid_size_meters)
+    y_coords = np.arange(miny, maxy + grid_size_meters, grid_size_meters)
+
+    # Build every candidate cell in one vectorized shapely.box call, then
+    # keep the ones touching the ward via a single batched STRtree query —
+    # no per-cell Python intersects calls.
+    cell_minx, cell_miny = np.meshgrid(x_coords[:-1], y_coords[:-1])
+    cell_minx = cell_minx.ravel()
+    cell_miny = cell_miny.ravel()
+    candidate_cells = shapely.box(
+        cell_minx, cell_miny,
+        cell_minx + grid_size_meters, cell_miny + grid_size_meters
+    )
+    cell_tree = shapely.STRtree(candidate_cells)
+    hits = np.sort(cell_tree.query(clicked_gdf_proj.geometry.values[0], predicate="intersects"))
+
+    if not len(hits):
+        return gpd.GeoDataFrame(geometry=[], crs="EPSG:4326")
+
+    # Reproject the shared corner lattice in one batched pyproj call and
+    # assemble the lon/lat cells directly, instead of round-tripping every
+    # kept cell polygon through GeoSeries.to_crs.
+    transformer = pyproj.Transformer.from_crs("EPSG:32643", "EPSG:4326", always_xy=True)
+    lon_grid, lat_grid = transformer.transform(*np.meshgrid(x_coords, y_coords))
+    corners = np.stack([lon_grid, lat_grid], axis=-1)
+    rings = np.stack([
+        corners[:-1, :-1], corners[:-1, 1:], corners[1:, 1:], corners[1:, :-1], corners[:-1, :-1]
+    ], axis=2).reshape(-1, 5, 2)
+    grid_gdf = gpd.GeoDataFrame(geometry=shapely.polygons(rings[hits]), crs="EPSG:4326")
+
+    minx4326, miny4326, maxx4326, maxy4326 = clicked_gdf.total_bounds
+    # .cx answers the bbox filter from the spatial index instead of running
+    # a full intersects scan over every incident point.
+    relevant_flood_points = _all_flood_points_gdf.cx[minx4326:maxx4326, miny4326:maxy4326]
+
+    # Query the grid's spatial index with the ward-local points and count
+    # per-cell hits with bincount — the cell indices are a dense 0..N-1
+    # range, so this replaces the sjoin plus hash-based groupby and merge.
+    _, cell_idx = grid_gdf.sindex.query(relevant_flood_points.geometry.values, predicate="intersects")
+    grid_gdf['incident_count_in_cell'] = np.bincount(cell_idx, minlength=len(grid_gdf)).astype(int)
+    grid_gdf['grid_risk_level'] = assign_grid_risk_levels(grid_gdf['incident_count_in_cell'])
+    # Bake the per-cell styling into the cached frame so the Folium
+    # style_function is a plain property lookup at render time.
+    grid_gdf['fill_color'] = grid_gdf['grid_risk_level'].map(grid_risk_colors)
+    grid_gdf['fill_opacity'] = np.where(grid_gdf['incident_count_in_cell'] > 0, 0.8, 0.0)
+
+    return grid_gdf
+
+
+# Simulation outcomes only change meaningfully every 0.5x, so the what-if
+# slider moves in this step and cached frames are keyed to it.
+SIM_MULTIPLIER_STEP = 0.5
+
+
+@st.cache_data(ttl=3600)
+def simulate_rainfall_impact(_wards_gdf, rainfall_multiplier: float, version_key: str) -> gpd.GeoDataFrame:
+    """Projects per-ward flood risk under a hypothetical rainfall multiplier.
+
+    Cached per (multiplier step, data version): each snapped multiplier is
+    simulated once, so moving the slider over values already seen is a
+    lookup rather than a recomputation.
+    """
+    simulated_gdf = _wards_gdf.copy()
+    # Vulnerability scales with the rainfall multiplier; re-bucket the
+    # scaled composite index into simulated impact levels.
+    simulated_score = np.clip(
+        simulated_gdf['Composite_Resilience_Index'].to_numpy() * rainfall_multiplier, 0, 200
+    )
+    simulated_gdf['simulated_impact_score'] = simulated_score
+    sim_edges = np.array([35, 60, 85, 110])
+    sim_labels = np.array(["Low Impact", "Minor Flooding", "Significant Flooding",
+                           "Severe Flooding", "Catastrophic"])
+    simulated_gdf['simulated_risk_level'] = sim_labels[
+        np.searchsorted(sim_edges, simulated_score, side='right')
+    ]
+    simulated_gdf['sim_fill_color'] = simulated_gdf['simulated_risk_level'].map(simulated_colors)
+    return simulated_gdf
+
+
+@st.cache_resource
+def _grid_prefetch_pool() -> ThreadPoolExecutor:
+    """Shared background pool used to warm the ward-grid cache for wards the
+    user is likely to open next."""
+    return ThreadPoolExecutor(max_workers=4, thread_name_prefix="grid-prefetch")
+
+
+# Display simplification tolerances (meters, applied in the metric CRS — a
+# degree tolerance would be anisotropic at this latitude). At overview zoom
+# most source vertices collapse to sub-pixel distances; the detail tolerance
+# is an order of magnitude finer for single-ward views.
+SIMPLIFY_TOLERANCE_OVERVIEW = 50
+SIMPLIFY_TOLERANCE_DETAIL = 5
+
+
+def _simplify_for_display(gdf, tolerance_meters: float):
+    """Returns a display copy simplified with a metric Douglas-Peucker
+    tolerance (round-trips through EPSG:32643; callers cache the result)."""
+    display_gdf = gdf.copy()
+    display_gdf['geometry'] = (
+        gdf.geometry.to_crs(epsg=32643)
+        .simplify(tolerance_meters, preserve_topology=True)
+        .to_crs(gdf.crs)
+    )
+    return display_gdf
+
+
+@st.cache_data(ttl=3600)
+def serialize_layer_geojson(_gdf, layer_key: str, version_key: str,
+                            simplify_tolerance: float = None) -> str:
+    """Serializes a map layer to its GeoJSON string once per (layer, data
+    version). Folium accepts the raw string, so reruns skip the
+    __geo_interface__ dict walk and re-serialization for unchanged layers.
+    An optional metric Douglas-Peucker tolerance thins display vertices
+    first."""
+    gdf = _gdf
+    if simplify_tolerance:
+        gdf = _simplify_for_display(_gdf, simplify_tolerance)
+    return gdf.to_json()
+
+
+@st.cache_data(ttl=3600)
+def build_incident_density_overlay(_points_xy, version_key: str, size: int = 512) -> Tuple[np.ndarray, list]:
+    """Rasterizes the incident points into a smoothed RGBA density image.
+
+    Returns the image array and its [[south, west], [north, east]] bounds
+    for a folium ImageOverlay. The KDE-style smoothing runs once server-side
+    in NumPy, so the browser draws a single image instead of doing per-frame
+    vector or heatmap work.
+    """
+    lons, lats = _points_xy[:, 0], _points_xy[:, 1]
+    pad = 0.01
+    minx, maxx = lons.min() - pad, lons.max() + pad
+    miny, maxy = lats.min() - pad, lats.max() + pad
+    heat, _, _ = np.histogram2d(lats, lons, bins=size, range=[[miny, maxy], [minx, maxx]])
+
+    # Separable binomial smoothing approximates a Gaussian blur; two passes
+    # widen the kernel enough for a smooth surface at this resolution.
+    kernel = np.array([1.0, 4.0, 6.0, 4.0, 1.0])
+    kernel /= kernel.sum()
+    for _ in range(2):
+        for axis in (0, 1):
+            smoothed = np.zeros_like(heat)
+            for offset, weight in zip(range(-2, 3), kernel):
+                smoothed += weight * np.roll(heat, offset, axis=axis)
+            heat = smoothed
+
+    # Yellow-to-red ramp with alpha fading to full transparency on empty cells
+    norm = heat / max(heat.max(), 1e-12)
+    rgba = np.zeros((size, size, 4), dtype=np.uint8)
+    rgba[..., 0] = 255
+    rgba[..., 1] = (255 * (1 - norm)).astype(np.uint8)
+    rgba[..., 3] = (np.clip(norm * 3, 0, 0.7) * 255).astype(np.uint8)
+
+    return rgba, [[miny, minx], [maxy, maxx]]
+
+
+@st.cache_data(ttl=3600)
+def serialize_wards_geojson(_wards_gdf, version_key: str) -> str:
+    """Serializes the wards layer to a GeoJSON string once per data version.
+
+    Geometries are Douglas-Peucker simplified to the overview tolerance and
+    snapped to a ~1e-5 degree (≈1m) grid, which trims serialized float
+    precision and collapses duplicate vertices, shrinking the payload
+    shipped to the browser. Reruns reuse the cached string instead of
+    re-walking every feature.
+    """
+    display_gdf = _simplify_for_display(_wards_gdf, SIMPLIFY_TOLERANCE_OVERVIEW)
+    # Default-mode set_precision re-nodes the topology and raises a
+    # TopologyException ("unable to assign free hole to a shell") when
+    # snapping pinches one of the simplified ward polygons. Pointwise
+    # snapping never throws; make_valid then repairs the few wards the
+    # rounding leaves degenerate.
+    display_gdf['geometry'] = shapely.make_valid(
+        shapely.set_precision(display_gdf.geometry.values, 1e-5, mode="pointwise")
+    )
+    return display_gdf.to_json()
+
+
 # ==============================================================================
 # DATA LOADING & INITIALIZATION
 # ==============================================================================
 
 # Load all data at startup
-bbmp_wards_raw, primary_drains, all_flood_points_gdf = load_geospatial_data()
+bbmp_wards_raw, primary_drains, all_flood_points_gdf, wards_proj, flood_points_proj, all_flood_points_xy = load_geospatial_data()
 rainfall_data = load_tabular_data()
 
-# Calculate and integrate all metrics
-bbmp_wards_metrics = calculate_flood_incident_metrics(bbmp_wards_raw, all_flood_points_gdf)
-bbmp_wards_metrics = calculate_drainage_metrics(bbmp_wards_metrics, primary_drains)
-bbmp_wards = calculate_composite_resilience_index(bbmp_wards_metrics, rainfall_data)
+# Calculate and integrate all metrics (served from the Parquet cache when warm)
+bbmp_wards = compute_or_load_ward_metrics(
+    bbmp_wards_raw, primary_drains, all_flood_points_gdf, wards_proj, flood_points_proj, rainfall_data
+)
 
 # Check if data loading was successful
 if bbmp_wards is None:
     st.error("FATAL ERROR: Data initialization failed.")
     st.stop()
 
+# Ward-name lookups happen on every interaction; a unique name index makes
+# them hash probes instead of full-column boolean scans.
+bbmp_wards = bbmp_wards.set_index('KGISWardName', drop=False)
+bbmp_wards.index.name = None
+
 
 # ==============================================================================
 # STYLING & COLOR PALETTES
@@ -281,6 +665,26 @@ simulated_colors = {
     "Low Impact": "#32CD32"            # LimeGreen
 }
 
+# Bake the resilience color into the wards frame once, so the ward layer
+# style functions resolve a precomputed property instead of a dict lookup
+# per feature per render.
+bbmp_wards['fill_color'] = bbmp_wards['resilience_level'].map(resilience_colors)
+
+# Shared tooltip styling: one class injected into the map document instead
+# of the same inline style string replicated onto every tooltip of every
+# layer. (Page-level CSS cannot reach the map iframe, so this is added to
+# the Folium document head.)
+TOOLTIP_CLASS = "haurcc-tt"
+TOOLTIP_CSS = """
+<style>
+.haurcc-tt {
+    background-color: #2C3E50; color: #E0E0E0;
+    font-family: 'Montserrat', sans-serif; font-size: 14px;
+    border: 1px solid #34495E; padding: 10px;
+}
+</style>
+"""
+
 # Grid Risk Colors - designed for clear visibility and distinction
 grid_risk_colors = {
     "Critical Risk": "#8B0000",
@@ -291,14 +695,15 @@ grid_risk_colors = {
     "No Incidents": "#00000000"
 }
 
-def assign_grid_risk_level(incident_count):
-    """Assigns a risk level to a grid cell based on incident count."""
-    if incident_count == 0: return "No Incidents"
-    elif incident_count == 1: return "Minor Risk"
-    elif incident_count <= 3: return "Low Risk"
-    elif incident_count <= 6: return "Moderate Risk"
-    elif incident_count <= 10: return "High Risk"
-    else: return "Critical Risk"
+# Upper-inclusive count thresholds: 0, 1, (1,3], (3,6], (6,10], >10
+GRID_RISK_EDGES = np.array([0, 1, 3, 6, 10])
+GRID_RISK_LABELS = np.array(["No Incidents", "Minor Risk", "Low Risk", "Moderate Risk", "High Risk", "Critical Risk"])
+
+
+def assign_grid_risk_levels(incident_counts: pd.Series) -> np.ndarray:
+    """Assigns risk levels to grid cells based on incident counts: one
+    searchsorted lookup into the label array, no Categorical intermediate."""
+    return GRID_RISK_LABELS[np.searchsorted(GRID_RISK_EDGES, incident_counts.to_numpy(), side='left')]
 
 # Custom CSS for a professional, high-impact dark look
 st.set_page_config(
@@ -484,7 +889,7 @@ st.markdown(f"""
         derived from robust civic and historical data for {CURRENT_MONTH_YEAR}.
     </p>
     """, unsafe_allow_html=True)
-st.markdown("---")
+st.divider()
 
 
 # Main Content Area
@@ -495,7 +900,7 @@ with st.sidebar:
     st.markdown("<p style='font-size: 1.05em; text-align: center; color: #BDC3C7;'>Navigate and configure the HAURCC display modes and insights.</p>", unsafe_allow_html=True)
 
     # --- Ward Selection & Display ---
-    ward_names = sorted(bbmp_wards['KGISWardName'].dropna().unique().tolist())
+    ward_names = _ward_names(bbmp_wards)
     ward_options = ["--- Bangalore City Overview ---"] + ward_names
 
     selected_ward_name = st.selectbox(
@@ -505,25 +910,35 @@ with st.sidebar:
         help="Choose 'Bangalore City Overview' for a macro view, or a specific ward for granular analysis."
     )
 
+    selected_basemap = st.radio(
+        "**🗺️ Basemap:**",
+        options=["CartoDB Positron", "OpenStreetMap", "Stamen TonerLite"],
+        key="basemap_selector",
+        help="Only the selected basemap is loaded by the map."
+    )
+
     selected_ward_gdf = None
     if selected_ward_name != " Bangalore City ":
-        selected_ward_gdf = bbmp_wards[bbmp_wards['KGISWardName'] == selected_ward_name].copy()
+        if selected_ward_name in bbmp_wards.index:
+            selected_ward_gdf = bbmp_wards.loc[[selected_ward_name]].copy()
+        else:
+            selected_ward_gdf = bbmp_wards.iloc[0:0].copy()
         if not selected_ward_gdf.empty:
-            display_properties = selected_ward_gdf.iloc[0].to_dict()
-            
-            st.markdown(f"<h3 style='color: #00C0FF;'>🏡 Ward: {display_properties.get('KGISWardName', 'N/A')}</h3>", unsafe_allow_html=True)
-            
+            # Scalar column access avoids materializing the whole row (incl.
+            # geometry) as a Python dict on every rerun
+            st.markdown(f"<h3 style='color: #00C0FF;'>🏡 Ward: {selected_ward_gdf['KGISWardName'].iat[0]}</h3>", unsafe_allow_html=True)
+
             # Display core metrics for the selected ward
-            resilience_level = display_properties.get('resilience_level', 'High Resilience')
-            resilience_score = display_properties.get('Composite_Resilience_Index', 0)
-            
-            st.markdown(f"**Ward No.:** <span style='font-size: 1.1em; color: #E0E0E0;'>{display_properties.get('KGISWardNo', 'N/A')}</span>", unsafe_allow_html=True)
-            st.markdown(f"**Area:** <span style='font-size: 1.1em; color: #E0E0E0;'>{display_properties.get('area_sqkm', 0):.2f} km²</span>", unsafe_allow_html=True)
+            resilience_level = selected_ward_gdf['resilience_level'].iat[0]
+            resilience_score = selected_ward_gdf['Composite_Resilience_Index'].iat[0]
+
+            st.markdown(f"**Ward No.:** <span style='font-size: 1.1em; color: #E0E0E0;'>{selected_ward_gdf['KGISWardNo'].iat[0]}</span>", unsafe_allow_html=True)
+            st.markdown(f"**Area:** <span style='font-size: 1.1em; color: #E0E0E0;'>{selected_ward_gdf['area_sqkm'].iat[0]:.2f} km²</span>", unsafe_allow_html=True)
             st.markdown(f"**Calculated Resilience:** <span style='color: {resilience_colors.get(resilience_level)}; font-weight: bold; font-size: 1.1em;'>{resilience_level}</span>", unsafe_allow_html=True)
             st.markdown(f"**Resilience Index:** <span style='font-weight: bold; color: #00FF99;'>{resilience_score:.2f} / 100</span>", unsafe_allow_html=True)
             
             # Granular Hotspot Analysis Controls
-            st.markdown("---")
+            st.divider()
             st.markdown("<h3 class='map-heading'>⚙️ Granular Hotspot Analysis</h3>", unsafe_allow_html=True)
             st.markdown("""
                 <p style='font-size: 0.9em; font-style: italic; color: #BDC3C7;'>
@@ -539,7 +954,7 @@ with st.sidebar:
             )
             st.session_state['grid_size_m'] = grid_size_m_option
             
-            st.markdown("---")
+            st.divider()
 
             # "What-If" Simulation Controls
             st.markdown("<h3 class='map-heading'>🔬 What-If Simulation</h3>", unsafe_allow_html=True)
@@ -550,9 +965,11 @@ with st.sidebar:
                 </p>
                 """, unsafe_allow_html=True)
             
+            # The slider moves in the same step the simulation is computed
+            # at, so the displayed multiplier always matches the results.
             rainfall_multiplier = st.slider(
                 "**Rainfall Multiplier:**",
-                min_value=0.5, max_value=5.0, value=1.0, step=0.1,
+                min_value=0.5, max_value=5.0, value=1.0, step=SIM_MULTIPLIER_STEP,
                 help="Select a value to represent a rainfall event (e.g., 2.0 for double the normal rainfall)."
             )
             
@@ -573,88 +990,193 @@ with st.sidebar:
 # MAP GENERATION & DISPLAY
 # ==============================================================================
 
-with col1:
-    map_center = [12.9716, 77.5946]
-    zoom_level = 11
-
-    basemaps = {
-        "OpenStreetMap": folium.TileLayer(tiles="OpenStreetMap", name="Base Map: OpenStreetMap", attr="OpenStreetMap contributors"),
-        "CartoDB Positron": folium.TileLayer(tiles="CartoDB Positron", name="Base Map: Positron", attr="CartoDB, OpenStreetMap contributors"),
-        "Stamen TonerLite": folium.TileLayer(tiles="Stamen TonerLite", name="Base Map: Toner Lite", attr="Stamen Design, OpenStreetMap contributors"),
-    }
-    
-    m = folium.Map(location=map_center, zoom_start=zoom_level, control_scale=True, tiles=basemaps["CartoDB Positron"])
-    for name, tile_layer_obj in basemaps.items():
-        if name != "CartoDB Positron":
-            tile_layer_obj.add_to(m)
+# Only the basemap chosen in the sidebar is instantiated: every extra
+# TileLayer added to the map makes Leaflet preload its tiles, tripling
+# initial tile fetches for layers most sessions never toggle. max_zoom
+# is capped at 16 — past that the app's layers carry no extra detail.
+BASEMAP_ATTRS = {
+    "OpenStreetMap": ("OpenStreetMap", "OpenStreetMap contributors"),
+    "CartoDB Positron": ("CartoDB Positron", "CartoDB, OpenStreetMap contributors"),
+    "Stamen TonerLite": ("Stamen TonerLite", "Stamen Design, OpenStreetMap contributors"),
+}
 
-    if selected_ward_name == "--- Bangalore City Overview ---":
-        st.markdown("<h2 class='map-heading'>🏙️ Bengaluru City-Wide Flood Resilience Overview</h2>", unsafe_allow_html=True)
-        st.info("Visualizing city-wide resilience index. Zoom and pan to explore. Use layer controls to toggle different data views.", icon="🗺️")
 
-        # Add all BBMP Wards, colored by their new resilience level
+def _make_base_map(basemap_name: str, center: list, zoom: int) -> folium.Map:
+    """Builds an empty map with the chosen basemap and shared tooltip CSS."""
+    tiles_id, tiles_attr = BASEMAP_ATTRS[basemap_name]
+    base_tiles = folium.TileLayer(
+        tiles=tiles_id, name=f"Base Map: {basemap_name}", attr=tiles_attr, max_zoom=16
+    )
+    m = folium.Map(location=center, zoom_start=zoom, control_scale=True, tiles=base_tiles)
+    m.get_root().header.add_child(folium.Element(TOOLTIP_CSS))
+    return m
+
+
+@st.cache_data(ttl=3600)
+def _incident_marker_rows(_all_flood_points_gdf, _points_xy, version_key: str) -> list:
+    """Raw per-point rows for the marker cluster, cached so the ward-detail
+    path (whose Map is rebuilt per rerun) skips the column extraction."""
+    return [
+        [lat, lon, name, loc, ward, wardno]
+        for (lon, lat), name, loc, ward, wardno in zip(
+            _points_xy.tolist(),
+            _all_flood_points_gdf['Name'].fillna('N/A').astype(str).tolist(),
+            _all_flood_points_gdf['LocationName'].fillna('N/A').astype(str).tolist(),
+            _all_flood_points_gdf['WARD_NAME'].astype(object).fillna('N/A').astype(str).tolist(),
+            _all_flood_points_gdf['WARDNO'].fillna('N/A').astype(str).tolist(),
+        )
+    ]
+
+
+def _add_shared_overlays(m, _primary_drains_gdf, _all_flood_points_gdf, _points_xy) -> None:
+    """Adds the layers every view shares: the drains network, the incident
+    marker clusters, and the layer control."""
+    # Add Primary Stormwater Drains Layer
+    if not _primary_drains_gdf.empty:
         folium.GeoJson(
-            bbmp_wards.__geo_interface__,
-            name="HAURCC: Ward Resilience Index",
-            style_function=lambda feature: {
-                "fillColor": resilience_colors.get(feature['properties'].get('resilience_level', 'High Resilience')),
-                "color": "#333333",
-                "weight": 0.8,
-                "fillOpacity": 0.75
-            },
+            serialize_layer_geojson(_primary_drains_gdf, "primary-drains", _source_data_version(),
+                                    simplify_tolerance=SIMPLIFY_TOLERANCE_DETAIL),
+            name="Primary Stormwater Drains",
+            smooth_factor=2.0,
+            style_function=lambda x: {"color": "#0099FF", "weight": 2.5, "opacity": 0.8},
             tooltip=folium.features.GeoJsonTooltip(
-                fields=['KGISWardName', 'KGISWardNo', 'Composite_Resilience_Index', 'resilience_level'],
-                aliases=['Ward Name:', 'Ward No.:', 'Resilience Index:', 'Resilience Level:'],
+                fields=['Name', 'Description', 'length_km'],
+                aliases=['Drain Name:', 'Description:', 'Length (km):'],
                 localize=True,
-                style="background-color: #2C3E50; color: #E0E0E0; font-family: 'Montserrat', sans-serif; font-size: 14px; border: 1px solid #34495E; padding: 10px;"
+                class_name=TOOLTIP_CLASS
             )
         ).add_to(m)
 
-        # Add a custom legend for the resilience levels
-        legend_html = f"""
-             <div style="position: fixed;
-                         bottom: 50px; left: 50px; width: 220px; height: 230px;
-                         border:2px solid #2C3E50; z-index:9999; font-size:14px;
-                         background-color:#1A1A1A; opacity:0.95; padding:15px; border-radius:12px;
-                         box-shadow: 0 5px 15px rgba(0,0,0,0.4); color: #E0E0E0; font-family: 'Montserrat', sans-serif;">
-               &nbsp; <b>Ward Resilience Index</b> <br>
-               &nbsp; <i class="legend-i" style="background:{resilience_colors['Extreme Vulnerability']}"></i> Extreme Vulnerability <br>
-               &nbsp; <i class="legend-i" style="background:{resilience_colors['High Vulnerability']}"></i> High Vulnerability <br>
-               &nbsp; <i class="legend-i" style="background:{resilience_colors['Moderate Vulnerability']}"></i> Moderate Vulnerability <br>
-               &nbsp; <i class="legend-i" style="background:{resilience_colors['Low Vulnerability']}"></i> Low Vulnerability <br>
-               &nbsp; <i class="legend-i" style="background:{resilience_colors['High Resilience']}"></i> High Resilience <br>
-             </div>
-             """
-        m.get_root().html.add_child(folium.Element(legend_html))
-
-        # Add City-Wide Incident Density Heatmap
-        coords = [[p.y, p.x] for p in all_flood_points_gdf.geometry if p and p.geom_type == 'Point']
-        if coords:
-            folium.plugins.HeatMap(coords, name="Global Flood Incident Density", radius=15, blur=10, max_zoom=14).add_to(m)
+    # Add ALL Flood Incident Points (Historical Markers)
+    if not _all_flood_points_gdf.empty:
+        # Ship only the raw fields per point; the JS callback assembles the
+        # tooltip HTML client-side, so the serialized payload carries each
+        # label once (in the callback) instead of per-marker HTML strings.
+        marker_rows = _incident_marker_rows(_all_flood_points_gdf, _points_xy, _source_data_version())
+        marker_callback = """
+            function (row) {
+                var marker = L.circleMarker([row[0], row[1]], {
+                    radius: 6, color: '#CC0000', fill: true,
+                    fillColor: '#FF0000', fillOpacity: 0.9
+                });
+                marker.bindTooltip(
+                    '<b>Incident:</b> ' + row[2]
+                    + '<br><b>Location:</b> ' + row[3]
+                    + '<br><b>Ward:</b> ' + row[4]
+                    + '<br><b>Ward No.:</b> ' + row[5]
+                );
+                return marker;
+            }
+        """
+        folium.plugins.FastMarkerCluster(
+            marker_rows, callback=marker_callback,
+            name="Historical Flood Incidents (Clusters)"
+        ).add_to(m)
+
+    # Add Layer Control to toggle layers
+    folium.LayerControl(collapsed=False).add_to(m)
+
+
+@st.cache_resource(ttl=3600)
+def build_city_overview_map(basemap_name: str, version_key: str, _wards_gdf,
+                            _primary_drains_gdf, _all_flood_points_gdf, _points_xy) -> folium.Map:
+    """Assembles the complete city-wide overview map once per (basemap, data
+    version). Its inputs never change between reruns, so unrelated widget
+    interactions reuse the finished Map object instead of re-running every
+    layer, legend, and overlay build."""
+    m = _make_base_map(basemap_name, [12.9716, 77.5946], 11)
+
+    # Add all BBMP Wards, colored by their new resilience level
+    folium.GeoJson(
+        serialize_wards_geojson(_wards_gdf, version_key),
+        name="HAURCC: Ward Resilience Index",
+        # Coarser client-side simplification: at overview zoom the extra
+        # vertices are sub-pixel, and Leaflet redraws noticeably faster.
+        smooth_factor=2.0,
+        style_function=lambda feature: {
+            "fillColor": feature['properties']['fill_color'],
+            "color": "#333333",
+            "weight": 0.8,
+            "fillOpacity": 0.75
+        },
+        tooltip=folium.features.GeoJsonTooltip(
+            fields=['KGISWardName', 'KGISWardNo', 'Composite_Resilience_Index', 'resilience_level'],
+            aliases=['Ward Name:', 'Ward No.:', 'Resilience Index:', 'Resilience Level:'],
+            localize=True,
+            class_name=TOOLTIP_CLASS
+        )
+    ).add_to(m)
+
+    # Add a custom legend for the resilience levels
+    legend_html = f"""
+         <div style="position: fixed;
+                     bottom: 50px; left: 50px; width: 220px; height: 230px;
+                     border:2px solid #2C3E50; z-index:9999; font-size:14px;
+                     background-color:#1A1A1A; opacity:0.95; padding:15px; border-radius:12px;
+                     box-shadow: 0 5px 15px rgba(0,0,0,0.4); color: #E0E0E0; font-family: 'Montserrat', sans-serif;">
+           &nbsp; <b>Ward Resilience Index</b> <br>
+           &nbsp; <i class="legend-i" style="background:{resilience_colors['Extreme Vulnerability']}"></i> Extreme Vulnerability <br>
+           &nbsp; <i class="legend-i" style="background:{resilience_colors['High Vulnerability']}"></i> High Vulnerability <br>
+           &nbsp; <i class="legend-i" style="background:{resilience_colors['Moderate Vulnerability']}"></i> Moderate Vulnerability <br>
+           &nbsp; <i class="legend-i" style="background:{resilience_colors['Low Vulnerability']}"></i> Low Vulnerability <br>
+           &nbsp; <i class="legend-i" style="background:{resilience_colors['High Resilience']}"></i> High Resilience <br>
+         </div>
+         """
+    m.get_root().html.add_child(folium.Element(legend_html))
+
+    # Add City-Wide Incident Density, rasterized server-side
+    if len(_points_xy):
+        density_image, density_bounds = build_incident_density_overlay(_points_xy, version_key)
+        folium.raster_layers.ImageOverlay(
+            image=density_image,
+            bounds=density_bounds,
+            origin="lower",
+            opacity=0.6,
+            name="Global Flood Incident Density",
+        ).add_to(m)
+
+    _add_shared_overlays(m, _primary_drains_gdf, _all_flood_points_gdf, _points_xy)
+    return m
+
+
+with col1:
+    if selected_ward_name == "--- Bangalore City Overview ---":
+        st.markdown("<h2 class='map-heading'>🏙️ Bengaluru City-Wide Flood Resilience Overview</h2>", unsafe_allow_html=True)
+        st.info("Visualizing city-wide resilience index. Zoom and pan to explore. Use layer controls to toggle different data views.", icon="🗺️")
+
+        m = build_city_overview_map(
+            selected_basemap, _source_data_version(),
+            bbmp_wards, primary_drains, all_flood_points_gdf, all_flood_points_xy
+        )
 
     else: # A specific ward is selected
+        m = _make_base_map(selected_basemap, [12.9716, 77.5946], 11)
         if selected_ward_gdf is not None and not selected_ward_gdf.empty:
             st.markdown(f"<h2 class='map-heading'>📍 HAURCC: {selected_ward_name} Detailed Analysis</h2>", unsafe_allow_html=True)
             
             # Center map on the selected ward
-            map_center = [selected_ward_gdf.geometry.centroid.y.iloc[0], selected_ward_gdf.geometry.centroid.x.iloc[0]]
+            map_center = [selected_ward_gdf['centroid_lat'].iat[0], selected_ward_gdf['centroid_lon'].iat[0]]
             zoom_level = 14
             m.location = map_center
             m.zoom_start = zoom_level
 
             # Check if a simulation is running
-            if st.session_state.get('simulation_run', False) and 'simulated_risk_level' in bbmp_wards.columns:
-                simulated_gdf = simulate_rainfall_impact(bbmp_wards, st.session_state['rainfall_multiplier'])
-                sim_ward_gdf = simulated_gdf[simulated_gdf['KGISWardName'] == selected_ward_name].iloc[0]
-                
-                st.warning(f"**Simulation Active:** Viewing hypothetical flood risk for a **{st.session_state['rainfall_multiplier']}x** rainfall event.", icon="⚠️")
-                st.markdown(f"<p style='font-size: 1.1em; color: #FFD700;'>Simulated Risk Level: <b style='color: {simulated_colors.get(sim_ward_gdf['simulated_risk_level'])}'>{sim_ward_gdf['simulated_risk_level']}</b></p>", unsafe_allow_html=True)
+            if st.session_state.get('simulation_run', False):
+                snapped_multiplier = round(
+                    st.session_state['rainfall_multiplier'] / SIM_MULTIPLIER_STEP
+                ) * SIM_MULTIPLIER_STEP
+                simulated_gdf = simulate_rainfall_impact(bbmp_wards, snapped_multiplier, _source_data_version())
+                sim_risk_level = simulated_gdf.at[selected_ward_name, 'simulated_risk_level']
+
+                st.warning(f"**Simulation Active:** Viewing hypothetical flood risk for a **{snapped_multiplier}x** rainfall event.", icon="⚠️")
+                st.markdown(f"<p style='font-size: 1.1em; color: #FFD700;'>Simulated Risk Level: <b style='color: {simulated_colors.get(sim_risk_level)}'>{sim_risk_level}</b></p>", unsafe_allow_html=True)
                 
                 folium.GeoJson(
                     simulated_gdf.__geo_interface__,
-                    name=f"Simulated Flood Risk ({st.session_state['rainfall_multiplier']}x Rainfall)",
+                    name=f"Simulated Flood Risk ({snapped_multiplier}x Rainfall)",
+                    smooth_factor=2.0,
                     style_function=lambda feature: {
-                        "fillColor": simulated_colors.get(feature['properties'].get('simulated_risk_level', 'Low Impact')),
+                        "fillColor": feature['properties']['sim_fill_color'],
                         "color": "#333333",
                         "weight": 0.5,
                         "fillOpacity": 0.85
@@ -663,7 +1185,7 @@ with col1:
                         fields=['KGISWardName', 'simulated_impact_score', 'simulated_risk_level'],
                         aliases=['Ward:', 'Simulated Score:', 'Simulated Risk:'],
                         localize=True,
-                        style="background-color: #2C3E50; color: #E0E0E0; font-family: 'Montserrat', sans-serif; font-size: 14px; border: 1px solid #34495E; padding: 10px;"
+                        class_name=TOOLTIP_CLASS
                     )
                 ).add_to(m)
 
@@ -683,10 +1205,11 @@ with col1:
             else:
                 # Add the SELECTED BBMP Ward boundary with its resilience color
                 folium.GeoJson(
-                    selected_ward_gdf.__geo_interface__,
+                    serialize_layer_geojson(selected_ward_gdf, f"ward-{selected_ward_name}", _source_data_version(),
+                                            simplify_tolerance=SIMPLIFY_TOLERANCE_DETAIL),
                     name=f"Selected Ward: {selected_ward_name}",
                     style_function=lambda feature: {
-                        "fillColor": resilience_colors.get(feature['properties'].get('resilience_level', 'High Resilience')),
+                        "fillColor": feature['properties']['fill_color'],
                         "color": "#000000",
                         "weight": 3.5,
                         "fillOpacity": 0.45
@@ -695,57 +1218,43 @@ with col1:
                         fields=['KGISWardName', 'KGISWardNo', 'Composite_Resilience_Index', 'resilience_level'],
                         aliases=['Ward Name:', 'Ward No.:', 'Resilience Index:', 'Resilience Level:'],
                         localize=True,
-                        style="background-color: #2C3E50; color: #E0E0E0; font-family: 'Montserrat', sans-serif; font-size: 14px; border: 1px solid #34495E; padding: 10px;"
+                        class_name=TOOLTIP_CLASS
                     )
                 ).add_to(m)
 
             # Grid Generation and Display for Selected Ward
             try:
-                clicked_shape = selected_ward_gdf.geometry.iloc[0]
-                clicked_gdf = gpd.GeoDataFrame([1], geometry=[clicked_shape], crs="EPSG:4326")
-                clicked_gdf_proj = clicked_gdf.to_crs("EPSG:32643")
-                
-                minx, miny, maxx, maxy = clicked_gdf_proj.total_bounds
                 grid_size_meters = st.session_state.get('grid_size_m', 250)
-                polygons = []
-                x_coords = np.arange(minx, maxx + grid_size_meters, grid_size_meters)
-                y_coords = np.arange(miny, maxy + grid_size_meters, grid_size_meters)
-
-                for i in range(len(x_coords) - 1):
-                    for j in range(len(y_coords) - 1):
-                        grid_cell_proj = box(x_coords[i], y_coords[j], x_coords[i+1], y_coords[j+1])
-                        if clicked_gdf_proj.geometry.iloc[0].intersects(grid_cell_proj):
-                            polygons.append(grid_cell_proj)
-                
-                if polygons:
-                    grid_gdf_proj = gpd.GeoDataFrame(geometry=polygons, crs="EPSG:32643")
-                    grid_gdf = grid_gdf_proj.to_crs("EPSG:4326")
-
-                    ward_bounds = selected_ward_gdf.total_bounds
-                    bbox_poly = box(ward_bounds[0], ward_bounds[1], ward_bounds[2], ward_bounds[3])
-                    relevant_flood_points = all_flood_points_gdf[all_flood_points_gdf.geometry.intersects(bbox_poly)]
-
-                    grid_with_points = gpd.sjoin(grid_gdf, relevant_flood_points, how="left", predicate="intersects")
-                    incident_counts_per_grid_cell = grid_with_points.groupby(grid_with_points.index).size().rename("incident_count_in_cell")
-                    
-                    grid_gdf = grid_gdf.merge(incident_counts_per_grid_cell, left_index=True, right_index=True, how="left")
-                    grid_gdf['incident_count_in_cell'] = grid_gdf['incident_count_in_cell'].fillna(0).astype(int)
-                    grid_gdf['grid_risk_level'] = grid_gdf['incident_count_in_cell'].apply(assign_grid_risk_level)
-                    
+                grid_gdf = build_ward_grid(
+                    selected_ward_name, grid_size_meters, _source_data_version(),
+                    bbmp_wards, all_flood_points_gdf
+                )
+
+                # Only cells with incidents carry information (empty cells
+                # render fully transparent anyway), so keep them out of the
+                # payload sent to the browser. Wards without any hot cell
+                # skip the layer entirely — an empty FeatureCollection would
+                # break the tooltip field resolution at render time.
+                hot_cells_gdf = (
+                    grid_gdf[grid_gdf['incident_count_in_cell'] > 0]
+                    if not grid_gdf.empty else grid_gdf
+                )
+                if not hot_cells_gdf.empty:
                     folium.GeoJson(
-                        grid_gdf.__geo_interface__,
+                        serialize_layer_geojson(
+                            hot_cells_gdf, f"grid-hot-{selected_ward_name}-{grid_size_meters}", _source_data_version()
+                        ),
                         name=f"{st.session_state['grid_size_m']}m Grid Hotspots",
                         style_function=lambda feature: {
-                            "color": "#A0A0A0",
-                            "weight": 0.7,
-                            "fillColor": grid_risk_colors.get(feature['properties'].get('grid_risk_level', 'No Incidents')),
-                            "fillOpacity": 0.8 if feature['properties'].get('incident_count_in_cell', 0) > 0 else 0.0,
+                            "stroke": False,
+                            "fillColor": feature['properties']['fill_color'],
+                            "fillOpacity": feature['properties']['fill_opacity'],
                         },
                         tooltip=folium.features.GeoJsonTooltip(
                             fields=['incident_count_in_cell', 'grid_risk_level'],
                             aliases=['Flood Incidents in this cell:', 'Grid Risk Level:'],
                             localize=True,
-                            style="background-color: #2C3E50; color: #E0E0E0; font-family: 'Montserrat', sans-serif; font-size: 14px; border: 1px solid #34495E; padding: 10px;"
+                            class_name=TOOLTIP_CLASS
                         )
                     ).add_to(m)
                     st.info(f"Viewing localized flood hotspots with a {st.session_state['grid_size_m']}m grid. Hover over colored cells for incident counts.", icon="🔎")
@@ -762,8 +1271,10 @@ with col1:
                              </div>
                              """
                     m.get_root().html.add_child(folium.Element(grid_legend_html))
-                else:
+                elif grid_gdf.empty:
                     st.warning(f"Could not generate any intersecting {st.session_state.get('grid_size_m', 250)}m grid cells for {selected_ward_name}.", icon="⚠️")
+                else:
+                    st.info(f"No recorded flood incidents fall within {selected_ward_name}'s {st.session_state.get('grid_size_m', 250)}m grid cells.", icon="✅")
 
             except Exception as e:
                 st.error(f"Error during grid generation for {selected_ward_name}: {e}", icon="❌")
@@ -772,45 +1283,12 @@ with col1:
         else:
             st.warning(f"No GeoData found for ward: {selected_ward_name}. Please check the ward name in your GeoJSON data.", icon="⚠️")
 
-    # Add Primary Stormwater Drains Layer
-    if not primary_drains.empty:
-        folium.GeoJson(
-            primary_drains.__geo_interface__,
-            name="Primary Stormwater Drains",
-            style_function=lambda x: {"color": "#0099FF", "weight": 2.5, "opacity": 0.8},
-            tooltip=folium.features.GeoJsonTooltip(
-                fields=['Name', 'Description', 'length_km'],
-                aliases=['Drain Name:', 'Description:', 'Length (km):'],
-                localize=True,
-                style="background-color: #2C3E50; color: #E0E0E0; font-family: 'Montserrat', sans-serif; font-size: 14px; border: 1px solid #34495E; padding: 10px;"
-            )
-        ).add_to(m)
-
-    # Add ALL Flood Incident Points (Historical Markers)
-    if not all_flood_points_gdf.empty:
-        mc = folium.plugins.MarkerCluster(name="Historical Flood Incidents (Clusters)").add_to(m)
-        for idx, row in all_flood_points_gdf.iterrows():
-            if row.geometry and row.geometry.geom_type == 'Point':
-                folium.CircleMarker(
-                    location=[row.geometry.y, row.geometry.x],
-                    radius=6,
-                    color='#CC0000',
-                    fill=True,
-                    fill_color='#FF0000',
-                    fill_opacity=0.9,
-                    tooltip=folium.Tooltip(
-                        f"<b>Incident:</b> {row.get('Name', 'N/A')}<br>"
-                        f"<b>Location:</b> {row.get('LocationName', 'N/A')}<br>"
-                        f"<b>Ward:</b> {row.get('WARD_NAME', 'N/A')}<br>"
-                        f"<b>Ward No.:</b> {row.get('WARDNO', 'N/A')}",
-                        style="font-family: 'Montserrat', sans-serif; font-size: 14px; background-color: #2C3E50; color: #E0E0E0; border: 1px solid #34495E; padding: 10px;"
-                    )
-                ).add_to(mc)
-
-    # Add Layer Control to toggle layers
-    folium.LayerControl(collapsed=False).add_to(m)
+        _add_shared_overlays(m, primary_drains, all_flood_points_gdf, all_flood_points_xy)
 
-    st_folium(m, width='100%', height=650, key="haurcc_map_display", returned_objects=[])
+    # folium_static renders the map one-way; st_folium's bidirectional
+    # bridge re-posted map state to the server and triggered reruns on
+    # interactions we never read.
+    folium_static(m, height=650)
 
 with col2:
     st.markdown("<p style='font-size: 1.1em; color: #BDC3C7;'>The interactive map provides the core operational view:</p>", unsafe_allow_html=True)
@@ -833,161 +1311,250 @@ with col2:
 # ADVANCED ANALYTICS SECTION
 # ==============================================================================
 
-st.markdown("---")
+st.divider()
 st.container()
 st.markdown("<h2 style='color: #00FF99;'>📈 Advanced Resilience Analytics</h2>", unsafe_allow_html=True)
 st.markdown("<p style='font-size: 1.1em; color: #BDC3C7;'>Dive deeper into Bengaluru's urban resilience profile with advanced data visualizations and comparative analysis.</p>", unsafe_allow_html=True)
 
-tab1, tab2, tab3, tab4 = st.tabs(["📊 Rainfall Patterns", "🤝 Ward Comparison", "📋 Incident Breakdown", "📈 Resilience Index Distribution"])
-
-
-with tab1: # Rainfall Patterns
-    st.markdown("<h3 style='color: #00C0FF;'>🌧️ Historical Rainfall Trends & Anomalies</h3>", unsafe_allow_html=True)
-    st.markdown("<p style='font-size: 0.95em; color: #E0E0E0;'>Analyze annual and monthly rainfall patterns, including deviations from the long-term mean.</p>", unsafe_allow_html=True)
-
-    if rainfall_data is not None and not rainfall_data.empty:
-        # Annual Rainfall Chart
-        annual_rainfall_chart = alt.Chart(rainfall_data).mark_line(point=True, color='#00C0FF').encode(
-            x=alt.X('Year:O', axis=alt.Axis(format='d', title='Year', titleColor='#E0E0E0', labelColor='#E0E0E0', labelAngle=-45)),
-            y=alt.Y('Total:Q', axis=alt.Axis(title='Total Annual Rainfall (mm)', titleColor='#E0E0E0', labelColor='#E0E0E0')),
-            tooltip=[alt.Tooltip('Year'), alt.Tooltip('Total', format='.1f', title='Rainfall')]
-        ).properties(
-            title=alt.Title('Total Annual Rainfall (1901-2024)', anchor='start', fontSize=18, color='#E0E0E0')
-        ).configure_axis(
-            gridColor='#34495E', domainColor='#34495E', tickColor='#34495E',
-        ).configure_view(
-            strokeWidth=0,
-            fill='#1A1A1A'
-        ).interactive()
-        st.altair_chart(annual_rainfall_chart, use_container_width=True)
-
-        # Annual Rainfall Deviation Chart
-        deviation_chart = alt.Chart(rainfall_data).mark_bar().encode(
-            x=alt.X('Year:O', axis=alt.Axis(format='d', title='Year', titleColor='#E0E0E0', labelColor='#E0E0E0', labelAngle=-45)),
-            y=alt.Y('deviation_from_mean:Q', title='Deviation from Mean Annual Rainfall (mm)', axis=alt.Axis(titleColor='#E0E0E0', labelColor='#E0E0E0')),
-            color=alt.condition(
-                alt.datum.deviation_from_mean > 0,
-                alt.value('#00FF99'),
-                alt.value('#FF4500')
-            ),
-            tooltip=[
-                alt.Tooltip('Year'),
-                alt.Tooltip('Total', format='.1f', title='Actual Rainfall'),
-                alt.Tooltip('deviation_from_mean', format='.1f', title='Deviation')
-            ]
-        ).properties(
-            title=alt.Title('Annual Rainfall Deviation from Long-term Average', anchor='start', fontSize=18, color='#E0E0E0')
-        ).configure_axis(
-            gridColor='#34495E', domainColor='#34495E', tickColor='#34495E',
-        ).configure_view(
-            strokeWidth=0,
-            fill='#1A1A1A'
-        ).interactive()
-        st.altair_chart(deviation_chart, use_container_width=True)
-
-
-with tab2: # Ward Comparison
-    st.markdown("<h3 style='color: #00C0FF;'>🤝 Ward Performance Comparison</h3>", unsafe_allow_html=True)
-    st.markdown("<p style='font-size: 0.95em; color: #E0E0E0;'>Compare key resilience metrics across multiple BBMP wards side-by-side to identify best practices and areas needing urgent intervention.</p>", unsafe_allow_html=True)
-
-    wards_for_comparison = st.multiselect(
-        "**Select Wards for Comparison:**",
-        options=ward_names,
-        default=ward_names[:3],
-        key="comparison_wards_selector",
-        help="Choose 2-5 wards to compare their resilience metrics."
-    )
+# Each chart builder returns a plain Vega-Lite dict, cached on its input
+# frame, so reruns skip rebuilding the Altair object graph and re-serializing
+# the data; st.vega_lite_chart forwards the cached dict straight to the
+# frontend. The rainfall charts have fixed structure, so their specs are
+# module-level dict literals and the DataFrame is passed to
+# st.vega_lite_chart separately — no Altair validation pass at all, and the
+# data travels over Streamlit's Arrow path instead of inline JSON rows.
+
+_RAINFALL_CHART_CONFIG = {
+    "axis": {"gridColor": "#34495E", "domainColor": "#34495E", "tickColor": "#34495E"},
+    "view": {"strokeWidth": 0, "fill": "#1A1A1A"},
+}
 
-    if len(wards_for_comparison) > 0:
-        comparison_gdf = bbmp_wards[bbmp_wards['KGISWardName'].isin(wards_for_comparison)].copy()
-        if not comparison_gdf.empty:
-            # Prepare data for Altair chart
-            comparison_metrics = comparison_gdf[[
-                'KGISWardName',
-                'incident_density_sqkm',
-                'drainage_density_km_sqkm',
-                'Composite_Resilience_Index',
-                'normalized_proximity'
-            ]].set_index('KGISWardName').T.reset_index()
-            comparison_metrics = comparison_metrics.rename(columns={'index': 'Metric'})
-
-            melted_comparison = comparison_metrics.melt(
-                id_vars=['Metric'], var_name='Ward', value_name='Value'
-            )
+ANNUAL_RAINFALL_SPEC = {
+    "mark": {"type": "line", "point": True, "color": "#00C0FF"},
+    "encoding": {
+        "x": {"field": "Year", "type": "ordinal",
+              "axis": {"format": "d", "title": "Year", "titleColor": "#E0E0E0", "labelColor": "#E0E0E0", "labelAngle": -45}},
+        "y": {"field": "Total", "type": "quantitative",
+              "axis": {"title": "Total Annual Rainfall (mm)", "titleColor": "#E0E0E0", "labelColor": "#E0E0E0"}},
+        "tooltip": [
+            {"field": "Year", "type": "ordinal"},
+            {"field": "Total", "type": "quantitative", "format": ".1f", "title": "Rainfall"},
+        ],
+    },
+    "title": {"text": "Total Annual Rainfall (1901-2024)", "anchor": "start", "fontSize": 18, "color": "#E0E0E0"},
+    # Pan/zoom bound to the x axis only: year is the axis worth brushing,
+    # and dropping y handling thins the compiled Vega dataflow.
+    "params": [{"name": "grid", "select": {"type": "interval", "encodings": ["x"]}, "bind": "scales"}],
+    "config": _RAINFALL_CHART_CONFIG,
+}
+
+MONTHLY_RAINFALL_SPEC = {
+    "mark": {"type": "bar", "color": "#00C0FF"},
+    "encoding": {
+        "x": {"field": "Month", "type": "nominal", "sort": MONTHS_ORDER,
+              "axis": {"title": "Month", "titleColor": "#E0E0E0", "labelColor": "#E0E0E0"}},
+        "y": {"field": "Rainfall", "type": "quantitative",
+              "axis": {"title": "Average Rainfall (mm)", "titleColor": "#E0E0E0", "labelColor": "#E0E0E0"}},
+        "tooltip": [
+            {"field": "Month", "type": "nominal"},
+            {"field": "Rainfall", "type": "quantitative", "format": ".1f", "title": "Avg Rainfall"},
+        ],
+    },
+    "title": {"text": "Average Monthly Rainfall (1901-2024)", "anchor": "start", "fontSize": 18, "color": "#E0E0E0"},
+    "config": _RAINFALL_CHART_CONFIG,
+}
+
+
+@st.cache_data(ttl=3600)
+def build_rainfall_deviation_spec(rainfall_df) -> Dict[str, Any]:
+    """Annual rainfall deviation bar chart spec."""
+    chart = alt.Chart(rainfall_df).mark_bar().encode(
+        x=alt.X('Year:O', axis=alt.Axis(format='d', title='Year', titleColor='#E0E0E0', labelColor='#E0E0E0', labelAngle=-45)),
+        y=alt.Y('deviation_from_mean:Q', title='Deviation from Mean Annual Rainfall (mm)', axis=alt.Axis(titleColor='#E0E0E0', labelColor='#E0E0E0')),
+        color=alt.condition(
+            alt.datum.deviation_from_mean > 0,
+            alt.value('#00FF99'),
+            alt.value('#FF4500')
+        ),
+        tooltip=[
+            alt.Tooltip('Year'),
+            alt.Tooltip('Total', format='.1f', title='Actual Rainfall'),
+            alt.Tooltip('deviation_from_mean', format='.1f', title='Deviation')
+        ]
+    ).properties(
+        title=alt.Title('Annual Rainfall Deviation from Long-term Average', anchor='start', fontSize=18, color='#E0E0E0')
+    ).configure_axis(
+        gridColor='#34495E', domainColor='#34495E', tickColor='#34495E',
+    ).configure_view(
+        strokeWidth=0,
+        fill='#1A1A1A'
+    ).interactive()
+    return chart.to_dict()
+
+
+@st.cache_data(ttl=3600)
+def build_ward_comparison_spec(melted_df) -> Dict[str, Any]:
+    """Grouped ward metric comparison spec, cached per ward selection."""
+    chart = alt.Chart(melted_df).mark_bar().encode(
+        x=alt.X('Ward:N', title='Ward Name', axis=alt.Axis(titleColor='#E0E0E0', labelColor='#E0E0E0', labelAngle=-45)),
+        y=alt.Y('Value:Q', title='Metric Value (Normalized)', axis=alt.Axis(titleColor='#E0E0E0', labelColor='#E0E0E0')),
+        color=alt.Color('Ward:N', legend=alt.Legend(title="Ward", titleColor='#E0E0E0', labelColor='#E0E0E0')),
+        column=alt.Column('Metric:N', header=alt.Header(titleOrient="bottom", labelOrient="bottom", titleColor='#00FF99', labelColor='#E0E0E0')),
+        tooltip=[alt.Tooltip('Ward'), alt.Tooltip('Metric'), alt.Tooltip('Value', format='.2f')]
+    ).properties(
+        title=alt.Title('Ward Resilience Metric Comparison', anchor='start', fontSize=18, color='#E0E0E0')
+    ).configure_axis(
+        gridColor='#34495E', domainColor='#34495E', tickColor='#34495E',
+    ).configure_view(
+        strokeWidth=0, fill='#1A1A1A'
+    ).interactive()
+    return chart.to_dict()
+
+
+@st.cache_data(ttl=3600)
+def build_incident_breakdown_spec(counts_df) -> Dict[str, Any]:
+    """Incident-per-ward horizontal bar chart spec."""
+    chart = alt.Chart(counts_df).mark_bar().encode(
+        x=alt.X('Count:Q', title='Number of Incidents', axis=alt.Axis(titleColor='#E0E0E0', labelColor='#E0E0E0')),
+        y=alt.Y('Ward:N', sort='-x', title='Ward Name', axis=alt.Axis(titleColor='#E0E0E0', labelColor='#E0E0E0')),
+        color=alt.Color('Ward:N', legend=None),
+        tooltip=['Ward', 'Count']
+    ).properties(
+        title=alt.Title('Historical Flood Incident Breakdown by Ward', anchor='start', fontSize=18, color='#E0E0E0')
+    ).configure_axis(
+        gridColor='#34495E', domainColor='#34495E', tickColor='#34495E',
+    ).configure_view(
+        strokeWidth=0, fill='#1A1A1A'
+    ).interactive()
+    return chart.to_dict()
+
+
+@st.cache_data(ttl=3600)
+def build_resilience_distribution_spec(cri_df) -> Dict[str, Any]:
+    """Composite Resilience Index histogram spec."""
+    chart = alt.Chart(cri_df).mark_bar().encode(
+        x=alt.X('Composite_Resilience_Index:Q', bin=True, title='Resilience Index Score (0-100)', axis=alt.Axis(titleColor='#E0E0E0', labelColor='#E0E0E0')),
+        y=alt.Y('count():Q', title='Number of Wards', axis=alt.Axis(titleColor='#E0E0E0', labelColor='#E0E0E0')),
+        tooltip=[
+            alt.Tooltip('Composite_Resilience_Index', bin=True, title='Index Range'),
+            alt.Tooltip('count()', title='Ward Count')
+        ]
+    ).properties(
+        title=alt.Title('Distribution of Composite Resilience Index', anchor='start', fontSize=18, color='#E0E0E0')
+    ).configure_axis(
+        gridColor='#34495E', domainColor='#34495E', tickColor='#34495E',
+    ).configure_view(
+        strokeWidth=0, fill='#1A1A1A'
+    ).interactive()
+    return chart.to_dict()
+
+
+@st.fragment
+def _render_analytics_tabs() -> None:
+    """Analytics tabs live in their own fragment: interacting with the
+    widgets inside (e.g. the comparison multiselect) reruns only this
+    section, not the map assembly above."""
+    tab1, tab2, tab3, tab4 = st.tabs(["📊 Rainfall Patterns", "🤝 Ward Comparison", "📋 Incident Breakdown", "📈 Resilience Index Distribution"])
+
+
+    with tab1: # Rainfall Patterns
+        st.markdown("<h3 style='color: #00C0FF;'>🌧️ Historical Rainfall Trends & Anomalies</h3>", unsafe_allow_html=True)
+        st.markdown("<p style='font-size: 0.95em; color: #E0E0E0;'>Analyze annual and monthly rainfall patterns, including deviations from the long-term mean.</p>", unsafe_allow_html=True)
+
+        if rainfall_data is not None and rainfall_data.shape[0]:
+            average_monthly_rainfall, el_nino_str, la_nina_str = compute_rainfall_derivatives(rainfall_data)
+
+            annual_tab, monthly_tab, enso_tab = st.tabs(["Annual", "Monthly", "ENSO"])
+
+            with annual_tab:
+                st.vega_lite_chart(rainfall_data, ANNUAL_RAINFALL_SPEC, use_container_width=True)
+                st.vega_lite_chart(build_rainfall_deviation_spec(rainfall_data), use_container_width=True)
+
+            with monthly_tab:
+                st.vega_lite_chart(average_monthly_rainfall, MONTHLY_RAINFALL_SPEC, use_container_width=True)
+
+            with enso_tab:
+                st.markdown(f"<p style='font-size: 0.9em; color: #E0E0E0;'><b>El Ni&ntilde;o Years:</b> {el_nino_str}</p>", unsafe_allow_html=True)
+                st.markdown(f"<p style='font-size: 0.9em; color: #E0E0E0;'><b>La Ni&ntilde;a Years:</b> {la_nina_str}</p>", unsafe_allow_html=True)
+
+
+    with tab2: # Ward Comparison
+        st.markdown("<h3 style='color: #00C0FF;'>🤝 Ward Performance Comparison</h3>", unsafe_allow_html=True)
+        st.markdown("<p style='font-size: 0.95em; color: #E0E0E0;'>Compare key resilience metrics across multiple BBMP wards side-by-side to identify best practices and areas needing urgent intervention.</p>", unsafe_allow_html=True)
+
+        wards_for_comparison = st.multiselect(
+            "**Select Wards for Comparison:**",
+            options=ward_names,
+            default=ward_names[:3],
+            key="comparison_wards_selector",
+            help="Choose 2-5 wards to compare their resilience metrics."
+        )
+
+        # Warm the grid cache for the compared wards in the background: Shapely 2
+        # releases the GIL in its vectorized ops, so the grids are usually cached
+        # before the user switches the map to one of these wards.
+        prefetch_pool = _grid_prefetch_pool()
+        for _ward in wards_for_comparison:
+            if _ward != selected_ward_name:
+                prefetch_pool.submit(
+                    build_ward_grid, _ward, st.session_state.get('grid_size_m', 250),
+                    _source_data_version(), bbmp_wards, all_flood_points_gdf
+                )
+
+        if len(wards_for_comparison) > 0:
+            comparison_gdf = bbmp_wards.loc[wards_for_comparison].copy()
+            if not comparison_gdf.empty:
+                # Prepare data for Altair chart
+                comparison_metrics = comparison_gdf[[
+                    'KGISWardName',
+                    'incident_density_sqkm',
+                    'drainage_density_km_sqkm',
+                    'Composite_Resilience_Index',
+                    'normalized_proximity'
+                ]].set_index('KGISWardName').T.reset_index()
+                comparison_metrics = comparison_metrics.rename(columns={'index': 'Metric'})
+
+                melted_comparison = comparison_metrics.melt(
+                    id_vars=['Metric'], var_name='Ward', value_name='Value'
+                )
+
+                st.vega_lite_chart(build_ward_comparison_spec(melted_comparison), use_container_width=True)
+            else:
+                st.warning("No data available for selected wards. Please check your selection.", icon="⚠️")
+        else:
+            st.info("Select at least one ward for comparison from the dropdown above.", icon="💡")
+
+
+    with tab3: # Incident Breakdown
+        st.markdown("<h3 style='color: #00C0FF;'>⚠️ Incident Breakdown by Ward</h3>", unsafe_allow_html=True)
+        st.markdown("<p style='font-size: 0.95em; color: #E0E0E0;'>Analyze the distribution of historical flood incidents across different wards.</p>", unsafe_allow_html=True)
 
-            comparison_chart = alt.Chart(melted_comparison).mark_bar().encode(
-                x=alt.X('Ward:N', title='Ward Name', axis=alt.Axis(titleColor='#E0E0E0', labelColor='#E0E0E0', labelAngle=-45)),
-                y=alt.Y('Value:Q', title='Metric Value (Normalized)', axis=alt.Axis(titleColor='#E0E0E0', labelColor='#E0E0E0')),
-                color=alt.Color('Ward:N', legend=alt.Legend(title="Ward", titleColor='#E0E0E0', labelColor='#E0E0E0')),
-                column=alt.Column('Metric:N', header=alt.Header(titleOrient="bottom", labelOrient="bottom", titleColor='#00FF99', labelColor='#E0E0E0')),
-                tooltip=[alt.Tooltip('Ward'), alt.Tooltip('Metric'), alt.Tooltip('Value', format='.2f')]
-            ).properties(
-                title=alt.Title('Ward Resilience Metric Comparison', anchor='start', fontSize=18, color='#E0E0E0')
-            ).configure_axis(
-                gridColor='#34495E', domainColor='#34495E', tickColor='#34495E',
-            ).configure_view(
-                strokeWidth=0, fill='#1A1A1A'
-            ).interactive()
-            st.altair_chart(comparison_chart, use_container_width=True)
+        if not all_flood_points_gdf.empty and 'WARD_NAME' in all_flood_points_gdf.columns:
+            incident_ward_counts = incident_counts_by_ward(all_flood_points_gdf, _source_data_version())
+
+            st.vega_lite_chart(build_incident_breakdown_spec(incident_ward_counts), use_container_width=True)
         else:
-            st.warning("No data available for selected wards. Please check your selection.", icon="⚠️")
-    else:
-        st.info("Select at least one ward for comparison from the dropdown above.", icon="💡")
-
-
-with tab3: # Incident Breakdown
-    st.markdown("<h3 style='color: #00C0FF;'>⚠️ Incident Breakdown by Ward</h3>", unsafe_allow_html=True)
-    st.markdown("<p style='font-size: 0.95em; color: #E0E0E0;'>Analyze the distribution of historical flood incidents across different wards.</p>", unsafe_allow_html=True)
-
-    if not all_flood_points_gdf.empty and 'WARD_NAME' in all_flood_points_gdf.columns:
-        incident_ward_counts = all_flood_points_gdf['WARD_NAME'].value_counts().reset_index()
-        incident_ward_counts.columns = ['Ward', 'Count']
-
-        ward_breakdown_chart = alt.Chart(incident_ward_counts).mark_bar().encode(
-            x=alt.X('Count:Q', title='Number of Incidents', axis=alt.Axis(titleColor='#E0E0E0', labelColor='#E0E0E0')),
-            y=alt.Y('Ward:N', sort='-x', title='Ward Name', axis=alt.Axis(titleColor='#E0E0E0', labelColor='#E0E0E0')),
-            color=alt.Color('Ward:N', legend=None),
-            tooltip=['Ward', 'Count']
-        ).properties(
-            title=alt.Title('Historical Flood Incident Breakdown by Ward', anchor='start', fontSize=18, color='#E0E0E0')
-        ).configure_axis(
-            gridColor='#34495E', domainColor='#34495E', tickColor='#34495E',
-        ).configure_view(
-            strokeWidth=0, fill='#1A1A1A'
-        ).interactive()
-
-        st.altair_chart(ward_breakdown_chart, use_container_width=True)
-    else:
-        st.warning("Ward name data for incident breakdown is not available. Please ensure the 'WARD_NAME' column exists in your flood incident data.", icon="⚠️")
+            st.warning("Ward name data for incident breakdown is not available. Please ensure the 'WARD_NAME' column exists in your flood incident data.", icon="⚠️")
         
 
-with tab4: # Resilience Index Distribution
-    st.markdown("<h3 style='color: #00C0FF;'>📊 Resilience Index Distribution</h3>", unsafe_allow_html=True)
-    st.markdown("<p style='font-size: 0.95em; color: #E0E0E0;'>Visualize the distribution of the Composite Resilience Index across all BBMP wards to identify the overall resilience profile of the city.</p>", unsafe_allow_html=True)
+    with tab4: # Resilience Index Distribution
+        st.markdown("<h3 style='color: #00C0FF;'>📊 Resilience Index Distribution</h3>", unsafe_allow_html=True)
+        st.markdown("<p style='font-size: 0.95em; color: #E0E0E0;'>Visualize the distribution of the Composite Resilience Index across all BBMP wards to identify the overall resilience profile of the city.</p>", unsafe_allow_html=True)
     
-    if not bbmp_wards.empty and 'Composite_Resilience_Index' in bbmp_wards.columns:
-        distribution_chart = alt.Chart(bbmp_wards).mark_bar().encode(
-            x=alt.X('Composite_Resilience_Index:Q', bin=True, title='Resilience Index Score (0-100)', axis=alt.Axis(titleColor='#E0E0E0', labelColor='#E0E0E0')),
-            y=alt.Y('count():Q', title='Number of Wards', axis=alt.Axis(titleColor='#E0E0E0', labelColor='#E0E0E0')),
-            tooltip=[
-                alt.Tooltip('Composite_Resilience_Index', bin=True, title='Index Range'),
-                alt.Tooltip('count()', title='Ward Count')
-            ]
-        ).properties(
-            title=alt.Title('Distribution of Composite Resilience Index', anchor='start', fontSize=18, color='#E0E0E0')
-        ).configure_axis(
-            gridColor='#34495E', domainColor='#34495E', tickColor='#34495E',
-        ).configure_view(
-            strokeWidth=0, fill='#1A1A1A'
-        ).interactive()
-        
-        st.altair_chart(distribution_chart, use_container_width=True)
-    else:
-        st.warning("Resilience Index data is not available. Please check the data processing steps.", icon="⚠️")
+        if not bbmp_wards.empty and 'Composite_Resilience_Index' in bbmp_wards.columns:
+            st.vega_lite_chart(
+                build_resilience_distribution_spec(bbmp_wards[['Composite_Resilience_Index']]),
+                use_container_width=True,
+            )
+        else:
+            st.warning("Resilience Index data is not available. Please check the data processing steps.", icon="⚠️")
+
+
+_render_analytics_tabs()
 
 
 # --- Footer ---
-st.markdown("---")
+st.divider()
 st.markdown(f"""
     <div style='text-align: center; font-size: 0.9em; color: #BDC3C7; padding-top: 15px;'>
         <p>Developed for the Urban Resilience Hackathon - {CURRENT_MONTH_YEAR}</p>